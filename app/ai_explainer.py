@@ -1,6 +1,15 @@
-import requests
-
+import argparse
+import hashlib
+import json
 import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
 
 # Disable proxies completely
 os.environ["HTTP_PROXY"] = ""
@@ -10,9 +19,27 @@ os.environ["https_proxy"] = ""
 
 
 BACKEND_URL = "http://8.211.16.127/ask"
+REQUEST_TIMEOUT = 60   # seconds; a hung backend must not block the batch pool forever
+
+# Phrases that make the explainer attach event data to the prompt.
+DATA_TRIGGERS = ["use match stats", "summarize match stats"]
+
+# Questions pre-generated for every event by the batch mode below.
+STANDARD_QUESTIONS = [
+    "summarize match stats",
+    "use match stats: who won?",
+]
+
+ANSWER_CACHE_FILE = "answer_cache.json"
+DEFAULT_CACHE_TTL = 7 * 24 * 3600   # seconds
+DEFAULT_CACHE_SIZE = 512            # entries
+
+# Words that do not change what is being asked ("Can you please summarize..." == "summarize...").
+_FILLER_WORDS = {"a", "an", "the", "please", "can", "could", "you", "me", "us", "kindly"}
 
 
 def ask_qwen(prompt: str):
+    """Ask the backend; raises on HTTP errors or a reply without a response."""
     response = requests.post(
         BACKEND_URL,
         json={
@@ -20,7 +47,263 @@ def ask_qwen(prompt: str):
             "messages": [
                 {"role": "user", "content": prompt}
             ]
-        }
+        },
+        timeout=REQUEST_TIMEOUT,
     )
+    response.raise_for_status()
     data = response.json()
-    return data.get("response", "Error: no response")
+    if not data.get("response"):
+        raise RuntimeError("Backend returned no response.")
+    return data["response"]
+
+
+# ===================== PROMPTS =====================
+def wants_match_data(question: str) -> bool:
+    """True if the question asks for event data to be attached."""
+    question_lower = question.lower()
+    return any(key in question_lower for key in DATA_TRIGGERS)
+
+
+def build_match_context(heat_df, competitors_df) -> str:
+    """Describe the top 10 heat results as readable natural text."""
+    combined_df = heat_df.merge(
+        competitors_df,
+        how="left",
+        left_on="competition_competitor_id",
+        right_on="competition_competitor_id"
+    )
+
+    # Limit to top 10 rows for performance
+    combined_df = combined_df.head(10)
+
+    summary_lines = []
+    for _, row in combined_df.iterrows():
+        summary_lines.append(
+            f"{row.get('first_name', '')} {row.get('last_name', '')} from "
+            f"{row.get('started_for_nf_country_name', 'N/A')} ranked {row.get('final_rank', '?')} "
+            f"with {row.get('final_result', '—')} seconds in {row.get('round_name', '—')} "
+            f"({row.get('heat_name', '—')})."
+        )
+    return "\n".join(summary_lines)
+
+
+def build_prompt(question: str, context: str = "") -> str:
+    """Attach event data to the question, if any (no extra system guidance)."""
+    if not context:
+        return question
+    return f"""
+    {question}
+
+    Here is event data (top 10 rows) you can use to answer the question naturally:
+    {context}
+    """
+
+
+# ===================== ANSWER CACHE =====================
+def normalize_question(question: str) -> str:
+    """Lowercase, strip punctuation and filler words, collapse whitespace."""
+    words = re.sub(r"[^\w\s]", " ", question.lower()).split()
+    return " ".join(w for w in words if w not in _FILLER_WORDS)
+
+
+def context_hash(context: str) -> str:
+    return hashlib.sha256(context.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_key(event: str, question: str, context: str = "") -> str:
+    return f"{event}|{normalize_question(question)}|{context_hash(context)}"
+
+
+class AnswerCache:
+    """Thread-safe LRU cache of explainer answers with a time-to-live.
+
+    Entries are stamped with wall-clock time so they stay valid when the
+    cache is saved to disk by the batch mode and loaded by the dashboard.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE, ttl_seconds: float = DEFAULT_CACHE_TTL,
+                 clock=time.time):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries = OrderedDict()   # key -> (stored_at, answer)
+        self._lock = threading.Lock()
+        self._loaded_mtime = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str):
+        """Return the cached answer, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, answer = entry
+            if self.clock() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return answer
+
+    def put(self, key: str, answer: str):
+        with self._lock:
+            self._entries[key] = (self.clock(), answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def save(self, path: Path):
+        with self._lock:
+            entries = [[key, stored_at, answer] for key, (stored_at, answer) in self._entries.items()]
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(entries, ensure_ascii=False), encoding="utf-8")
+        # Replace atomically so a dashboard refresh never reads a half-written file.
+        tmp_path.replace(path)
+
+    def load(self, path: Path):
+        """Merge entries saved by save(); expired ones are skipped.
+
+        A missing or malformed file leaves the cache as it is, and is retried
+        by the next refresh().
+        """
+        if not path.exists():
+            return self
+        mtime = path.stat().st_mtime
+        try:
+            entries = [
+                (key, float(stored_at), answer)
+                for key, stored_at, answer in json.loads(path.read_text(encoding="utf-8"))
+            ]
+        except (ValueError, TypeError):
+            return self
+        # Only after a successful parse: mtimes can be too coarse to tell a
+        # fixed file from the broken one it replaced.
+        self._loaded_mtime = mtime
+
+        with self._lock:
+            for key, stored_at, answer in entries:
+                if self.clock() - stored_at <= self.ttl_seconds:
+                    self._entries[key] = (stored_at, answer)
+                    self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return self
+
+    def refresh(self, path: Path):
+        """Merge the file again if it changed since it was last loaded (e.g. after a batch run)."""
+        if path.exists() and path.stat().st_mtime != self._loaded_mtime:
+            self.load(path)
+        return self
+
+
+def ask_qwen_cached(question: str, event: str, context: str, cache: AnswerCache, ask=ask_qwen):
+    """Answer from the cache when possible, otherwise ask the backend and cache the reply.
+
+    `ask` is the upstream call; pass a stub to run without the backend. Errors
+    raised by `ask` propagate and nothing is cached for them.
+    """
+    key = cache_key(event, question, context)
+    answer = cache.get(key)
+    if answer is None:
+        answer = ask(build_prompt(question, context))
+        if answer:
+            cache.put(key, answer)
+    return answer
+
+
+# ===================== BATCH MODE =====================
+class RateLimiter:
+    """Space out calls so at most `calls_per_second` start each second, across threads."""
+
+    def __init__(self, calls_per_second: float):
+        self.interval = 1.0 / calls_per_second if calls_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        time.sleep(max(0.0, slot - now))
+
+
+def pregenerate_answers(event_contexts: dict, cache: AnswerCache, ask=ask_qwen,
+                        questions=STANDARD_QUESTIONS, max_workers: int = 4,
+                        calls_per_second: float = 2.0) -> list:
+    """Answer every standard question for every event concurrently, rate-limited.
+
+    event_contexts maps event name -> match context text. Returns one
+    {"event", "question", "status", "error"} record per job; a failing job
+    does not stop the others.
+    """
+    limiter = RateLimiter(calls_per_second)
+
+    def run(job):
+        event, question = job
+        context = event_contexts[event] if wants_match_data(question) else ""
+        if cache.get(cache_key(event, question, context)) is not None:
+            return {"event": event, "question": question, "status": "cached", "error": None}
+        try:
+            limiter.wait()
+            ask_qwen_cached(question, event, context, cache, ask=ask)
+            return {"event": event, "question": question, "status": "generated", "error": None}
+        except Exception as e:
+            return {"event": event, "question": question, "status": "failed", "error": str(e)}
+
+    jobs = [(event, question) for event in event_contexts for question in questions]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(run, jobs))
+
+
+def main():
+    # Imported here so the dashboard can use this module without pulling in the batch loader.
+    from dataset_manager import DatasetManager, EVENT_COLUMN
+
+    parser = argparse.ArgumentParser(description="Pre-generate standard AI explainer answers for every event.")
+    parser.add_argument("data_folder", type=Path, help="Folder containing event folders or snapshot bundles.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=2.0, help="Maximum backend calls per second.")
+    args = parser.parse_args()
+
+    manager = DatasetManager(args.data_folder)
+    event_contexts = {}
+    for path in manager.list_available_events():
+        if manager.is_snapshot(path):
+            try:
+                datasets = manager.load_snapshot(path)["raw"]
+            except ValueError as e:
+                fallback_folder = args.data_folder / manager.event_name(path)
+                if not fallback_folder.is_dir():
+                    print(f"Skipping {manager.event_name(path)}: {e}")
+                    continue
+                print(f"{e} Using {fallback_folder.name}/ instead.")
+                path = fallback_folder
+
+        if not manager.is_snapshot(path):
+            report = manager.load_events([path])
+            datasets = {table: df.drop(columns=[EVENT_COLUMN]) for table, df in report.tables.items()}
+
+        heat_df = datasets.get("heat_competitors")
+        competitors_df = datasets.get("competitors")
+        if heat_df is None or competitors_df is None:
+            print(f"Skipping {manager.event_name(path)}: missing heat_competitors or competitors.")
+            continue
+        event_contexts[manager.event_name(path)] = build_match_context(heat_df, competitors_df)
+
+    cache_path = args.data_folder / ANSWER_CACHE_FILE
+    cache = AnswerCache().load(cache_path)
+    results = pregenerate_answers(event_contexts, cache, max_workers=args.workers, calls_per_second=args.rate)
+    cache.save(cache_path)
+
+    for result in results:
+        line = f"{result['event']}: {result['question']!r} -> {result['status']}"
+        if result["error"]:
+            line += f" ({result['error']})"
+        print(line)
+    print(f"Saved {len(cache)} answers to {cache_path}")
+
+
+if __name__ == "__main__":
+    main()
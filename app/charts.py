@@ -0,0 +1,150 @@
+# =====================================================
+# CHARTS
+# =====================================================
+# Charts never see lap-level frames: every builder below takes a small,
+# pre-aggregated table produced by the aggregate functions, and those
+# aggregates are computed once per event and cached by event_chart_data().
+
+import altair as alt
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_loader import prepare_heat_results, prepare_lap_results
+
+
+DEFAULT_HISTOGRAM_BINS = 30
+PACE_QUANTILES = {"P10": 0.10, "Median": 0.50, "P90": 0.90}
+
+
+# ===================== AGGREGATES =====================
+def lap_time_histogram(lap_results: pd.DataFrame, bins: int = DEFAULT_HISTOGRAM_BINS) -> pd.DataFrame:
+    """Bin lap times into a fixed number of buckets (one row per bin)."""
+    empty = pd.DataFrame(columns=["Bin Start", "Bin End", "Laps"])
+    if "Lap Time (s)" not in lap_results.columns:
+        return empty
+
+    lap_times = pd.to_numeric(lap_results["Lap Time (s)"], errors="coerce").dropna()
+    if lap_times.empty:
+        return empty
+
+    counts, edges = np.histogram(lap_times.to_numpy(), bins=bins)
+    return pd.DataFrame({
+        "Bin Start": edges[:-1].round(3),
+        "Bin End": edges[1:].round(3),
+        "Laps": counts,
+    })
+
+
+def lap_pace_quantiles(lap_results: pd.DataFrame) -> pd.DataFrame:
+    """Per-lap lap-time quantiles for every heat (one row per round/heat/lap)."""
+    keys = ["Round Name", "Heat Name", "Lap"]
+    required = keys + ["Lap Time (s)"]
+    if lap_results.empty or not all(c in lap_results.columns for c in required):
+        return pd.DataFrame(columns=keys + list(PACE_QUANTILES))
+
+    df = lap_results[keys].copy()
+    df["Lap Time (s)"] = pd.to_numeric(lap_results["Lap Time (s)"], errors="coerce")
+    grouped = df.dropna(subset=["Lap Time (s)"]).groupby(keys)["Lap Time (s)"]
+
+    quantiles = pd.DataFrame({
+        name: grouped.quantile(q) for name, q in PACE_QUANTILES.items()
+    })
+    return quantiles.round(3).reset_index()
+
+
+def country_performance(heat_results: pd.DataFrame) -> pd.DataFrame:
+    """Average rank, best result and distinct athletes per country."""
+    columns = ["Country", "Average Rank", "Best Result (s)", "Athletes"]
+    required = ["Country", "Athlete", "Rank", "Result (s)"]
+    if heat_results.empty or not all(c in heat_results.columns for c in required):
+        return pd.DataFrame(columns=columns)
+
+    df = heat_results.copy()
+    df["Rank"] = pd.to_numeric(df["Rank"], errors="coerce")
+    df["Result (s)"] = pd.to_numeric(df["Result (s)"], errors="coerce")
+
+    stats = (
+        df.groupby("Country", as_index=False)
+        .agg(**{
+            "Average Rank": ("Rank", "mean"),
+            "Best Result (s)": ("Result (s)", "min"),
+            "Athletes": ("Athlete", "nunique"),
+        })
+        .sort_values("Average Rank", ascending=True)
+    )
+    return stats[columns].round(3).reset_index(drop=True)
+
+
+def compute_event_aggregates(datasets: dict) -> dict:
+    """Compute every chart aggregate for one event from its raw datasets."""
+    heat_competitors_df = datasets.get("heat_competitors")
+    laps_df = datasets.get("laps")
+    competitors_df = datasets.get("competitors")
+
+    lap_results = pd.DataFrame()
+    heat_results = pd.DataFrame()
+    if competitors_df is not None:
+        if laps_df is not None:
+            lap_results = prepare_lap_results(laps_df, competitors_df)
+        if heat_competitors_df is not None:
+            heat_results = prepare_heat_results(heat_competitors_df, competitors_df)
+
+    return {
+        "lap_histogram": lap_time_histogram(lap_results),
+        "pace_quantiles": lap_pace_quantiles(lap_results),
+        "country_performance": country_performance(heat_results),
+    }
+
+
+@st.cache_data(show_spinner=False)
+def event_chart_data(event_key: str, data_version: float, _datasets: dict) -> dict:
+    """Cached compute_event_aggregates(), computed once per event and data version.
+
+    Cached on event_key and data_version (latest CSV mtime, see
+    DatasetManager.data_version) so refreshed CSVs invalidate the charts; the
+    leading underscore tells Streamlit not to hash the raw datasets on each rerun.
+    """
+    return compute_event_aggregates(_datasets)
+
+
+# ===================== CHART BUILDERS =====================
+def lap_time_distribution_chart(histogram: pd.DataFrame) -> alt.Chart:
+    """Bar chart of pre-binned lap times."""
+    return (
+        alt.Chart(histogram)
+        .mark_bar()
+        .encode(
+            x=alt.X("Bin Start:Q", bin="binned", title="Lap Time (s)"),
+            x2="Bin End:Q",
+            y=alt.Y("Laps:Q", title="Laps"),
+            tooltip=["Bin Start", "Bin End", "Laps"],
+        )
+    )
+
+
+def pace_curve_chart(pace_quantiles: pd.DataFrame) -> alt.LayerChart:
+    """P10–P90 band with the median lap time for each lap of one heat."""
+    base = alt.Chart(pace_quantiles).encode(x=alt.X("Lap:O", title="Lap"))
+    band = base.mark_area(opacity=0.3).encode(
+        y=alt.Y("P10:Q", title="Lap Time (s)", scale=alt.Scale(zero=False)),
+        y2="P90:Q",
+    )
+    median = base.mark_line(point=True).encode(
+        y="Median:Q",
+        tooltip=["Lap", "P10", "Median", "P90"],
+    )
+    return band + median
+
+
+def country_performance_chart(performance: pd.DataFrame) -> alt.Chart:
+    """Horizontal bars of average rank per country (lower is better)."""
+    return (
+        alt.Chart(performance)
+        .mark_bar()
+        .encode(
+            x=alt.X("Average Rank:Q", title="Average Rank"),
+            y=alt.Y("Country:N", sort="x", title=None),
+            tooltip=["Country", "Average Rank", "Best Result (s)", "Athletes"],
+        )
+    )
@@ -2,12 +2,24 @@
 
 import streamlit as st
 import pandas as pd
+import requests
 from pathlib import Path
-import altair as alt
-from ai_explainer import ask_qwen
+from ai_explainer import (
+    ANSWER_CACHE_FILE,
+    AnswerCache,
+    ask_qwen_cached,
+    build_match_context,
+    wants_match_data,
+)
 
 
 from dataset_manager import DatasetManager
+from charts import (
+    event_chart_data,
+    lap_time_distribution_chart,
+    pace_curve_chart,
+    country_performance_chart,
+)
 
 from data_loader import (
     clean_events_dataframe,
@@ -19,6 +31,21 @@ from data_loader import (
 
 
 
+@st.cache_resource(max_entries=16)
+def _open_snapshot(bundle_path: str, data_version: float, _manager: DatasetManager) -> dict:
+    """One memory-mapped snapshot per bundle and version, shared across reruns and sessions."""
+    return _manager.load_snapshot(Path(bundle_path))
+
+
+@st.cache_resource
+def _answer_cache(cache_path: str) -> AnswerCache:
+    """One answer cache per process, seeded with answers pre-generated by ai_explainer.py.
+
+    Callers refresh() it so a later batch run is picked up without a restart.
+    """
+    return AnswerCache().load(Path(cache_path))
+
+
 # =====================================================
 # DASHBOARD
 # =====================================================
@@ -28,6 +55,10 @@ class Dashboard:
     def __init__(self, data_folder: Path):
         self.manager = DatasetManager(data_folder)
         self.datasets = {}
+        self.prepared = {}
+        self.chart_data = None
+        self.event_key = None
+        self.event_name = None
 
     # ---------------- ENTRY POINT ----------------
     def run(self):
@@ -42,32 +73,68 @@ class Dashboard:
         # Sidebar: select which dataset to explore
         selected_folder_name = st.sidebar.selectbox(
             "Select the event!",
-            [f.name for f in available_folders]
+            [self.manager.event_name(f) for f in available_folders]
         )
 
         selected_folder_path = next(
-            (f for f in available_folders if f.name == selected_folder_name), None
+            (f for f in available_folders if self.manager.event_name(f) == selected_folder_name), None
         )
         if selected_folder_path is None:
             st.error("Invalid dataset folder selected.")
             return
 
-        # Load datasets dynamically
-        self.datasets = self.manager.load_datasets_from_folder(selected_folder_path)
+        # Load datasets dynamically; snapshot bundles come already prepared
+        snapshot = None
+        if self.manager.is_snapshot(selected_folder_path):
+            try:
+                snapshot = _open_snapshot(
+                    str(selected_folder_path),
+                    self.manager.data_version(selected_folder_path),
+                    self.manager,
+                )
+            except ValueError as e:
+                # e.g. a bundle still being copied: serve the event folder if there is one
+                fallback_folder = self.manager.base_data_folder / selected_folder_name
+                if not fallback_folder.is_dir():
+                    st.error(str(e))
+                    return
+                st.warning(f"{e} Showing {fallback_folder.name}/ instead.")
+                selected_folder_path = fallback_folder
+
+        if snapshot is not None:
+            self.datasets = snapshot["raw"]
+            self.prepared = snapshot["cleaned"]
+            self.chart_data = snapshot["aggregates"]
+        else:
+            self.datasets = self.manager.load_datasets_from_folder(selected_folder_path)
+            self.prepared = {}
+            self.chart_data = None
+        self.event_key = str(selected_folder_path)
+        self.event_name = selected_folder_name
 
         # Continue as before
         self._show_events_overview(selected_folder_name)
 
+    # ---------------- PREPARED TABLES ----------------
+    def _prepared(self, name: str, builder, *table_names):
+        """Return a cleaned table from the open snapshot, or build it from the raw datasets."""
+        if name in self.prepared:
+            return self.prepared[name]
+
+        sources = [self.datasets.get(t) for t in table_names]
+        if any(source is None for source in sources):
+            return None
+        return builder(*sources)
+
     # ---------------- EVENTS OVERVIEW ----------------
     def _show_events_overview(self, folder_name: str):
         st.header(f"Events — {folder_name.replace('_', ' ').title()}")
 
-        events_df = self.datasets.get("events")
-        if events_df is None:
+        cleaned_events = self._prepared("events", clean_events_dataframe, "events")
+        if cleaned_events is None:
             st.error("events.csv not found.")
             return
 
-        cleaned_events = clean_events_dataframe(events_df)
         st.dataframe(cleaned_events, use_container_width=True)
 
         if len(cleaned_events) == 0:
@@ -98,42 +165,36 @@ class Dashboard:
 
         # -------------- ROUNDS --------------
         with tabs[1]:
-            rounds_df = self.datasets.get("rounds")
-            if rounds_df is not None:
-                cleaned_rounds = clean_rounds_dataframe(rounds_df)
+            cleaned_rounds = self._prepared("rounds", clean_rounds_dataframe, "rounds")
+            if cleaned_rounds is not None:
                 st.dataframe(cleaned_rounds, use_container_width=True)
             else:
                 st.info("No rounds data available.")
 
         # -------------- HEATS --------------
         with tabs[2]:
-            heats_df = self.datasets.get("heats")
-            if heats_df is not None:
-                cleaned_heats = clean_heats_dataframe(heats_df)
+            cleaned_heats = self._prepared("heats", clean_heats_dataframe, "heats")
+            if cleaned_heats is not None:
                 st.dataframe(cleaned_heats, use_container_width=True)
             else:
                 st.info("No heats data available.")
 
         # -------------- HEAT COMPETITORS --------------
         with tabs[3]:
-            heat_competitors_df = self.datasets.get("heat_competitors")
-            competitors_df = self.datasets.get("competitors")
-
-            if heat_competitors_df is not None and competitors_df is not None:
-                prepared_heat_results = prepare_heat_results(
-                    heat_competitors_df, competitors_df
-                )
+            prepared_heat_results = self._prepared(
+                "heat_results", prepare_heat_results, "heat_competitors", "competitors"
+            )
+            if prepared_heat_results is not None:
                 st.dataframe(prepared_heat_results, use_container_width=True)
             else:
                 st.info("Missing either heat_competitors.csv or competitors.csv.")
 
         # -------------- LAPS --------------
         with tabs[4]:
-            laps_df = self.datasets.get("laps")
-            competitors_df = self.datasets.get("competitors")
-
-            if laps_df is not None and competitors_df is not None:
-                prepared_laps = prepare_lap_results(laps_df, competitors_df)
+            prepared_laps = self._prepared(
+                "lap_results", prepare_lap_results, "laps", "competitors"
+            )
+            if prepared_laps is not None:
                 st.dataframe(prepared_laps, use_container_width=True)
             else:
                 st.info("Missing laps.csv or competitors.csv.")
@@ -152,54 +213,61 @@ class Dashboard:
             user_query = st.text_area("Ask about the event, heats, or athletes, or whatever else you want!:")
 
         if st.button("Ask Qwen"):
-            query_lower = user_query.lower()
+            cache_path = self.manager.base_data_folder / ANSWER_CACHE_FILE
+            answer_cache = _answer_cache(str(cache_path)).refresh(cache_path)
 
             # Determine if we should attach data
-            attach_data = any(key in query_lower for key in ["use match stats", "summarize match stats"])
-
-            if attach_data:
+            context = ""
+            if wants_match_data(user_query):
                 heat_df = self.datasets.get("heat_competitors")
                 competitors_df = self.datasets.get("competitors")
 
-                if heat_df is not None and competitors_df is not None:
-                    combined_df = heat_df.merge(
-                        competitors_df,
-                        how="left",
-                        left_on="competition_competitor_id",
-                        right_on="competition_competitor_id"
-                    )
-
-                    # Limit to top 10 rows for performance
-                    combined_df = combined_df.head(10)
-
-                    # Convert dataset into readable natural text (not hardcoded instructions)
-                    summary_lines = []
-                    for _, row in combined_df.iterrows():
-                        summary_lines.append(
-                            f"{row.get('first_name', '')} {row.get('last_name', '')} from "
-                            f"{row.get('started_for_nf_country_name', 'N/A')} ranked {row.get('final_rank', '?')} "
-                            f"with {row.get('final_result', '—')} seconds in {row.get('round_name', '—')} "
-                            f"({row.get('heat_name', '—')})."
-                        )
-                    text_data = "\n".join(summary_lines)
-
-                    # Inject event data only — no extra system guidance
-                    prompt = f"""
-    {user_query}
-
-    Here is event data (top 10 rows) you can use to answer the question naturally:
-    {text_data}
-    """
-                    st.write(ask_qwen(prompt))
-                else:
+                if heat_df is None or competitors_df is None:
                     st.warning("Event data not available for this view.")
-            else:
-                # No data context — regular chat
-                st.write(ask_qwen(user_query))
+                    return
+                context = build_match_context(heat_df, competitors_df)
+
+            # Without data context this is a regular chat
+            try:
+                st.write(ask_qwen_cached(user_query, self.event_name, context, answer_cache))
+            except (requests.RequestException, RuntimeError, ValueError) as e:
+                st.error(f"Qwen is not available right now: {e}")
+
+    # =====================================================
+    # CHARTS
+    # =====================================================
+    def _show_event_charts(self):
+        """Charts built from cached, pre-aggregated event data."""
+        chart_data = self.chart_data
+        if chart_data is None:
+            chart_data = event_chart_data(
+                self.event_key, self.manager.data_version(Path(self.event_key)), self.datasets
+            )
 
+        st.subheader("Lap Time Distribution")
+        if chart_data["lap_histogram"].empty:
+            st.info("No lap times available.")
+        else:
+            st.altair_chart(lap_time_distribution_chart(chart_data["lap_histogram"]), use_container_width=True)
+
+        st.subheader("Pace Curve per Heat")
+        pace = chart_data["pace_quantiles"]
+        if pace.empty:
+            st.info("No lap times available.")
+        else:
+            heats = pace[["Round Name", "Heat Name"]].drop_duplicates()
+            heat_labels = [f"{r} — {h}" for r, h in heats.itertuples(index=False)]
+            selected_heat = st.selectbox("Select a Heat", heat_labels)
+            round_name, heat_name = heats.iloc[heat_labels.index(selected_heat)]
+            heat_pace = pace.query("`Round Name` == @round_name and `Heat Name` == @heat_name")
+            st.altair_chart(pace_curve_chart(heat_pace), use_container_width=True)
+
+        st.subheader("Country Performance")
+        if chart_data["country_performance"].empty:
+            st.info("No results available.")
+        else:
+            st.altair_chart(country_performance_chart(chart_data["country_performance"]), use_container_width=True)
 
-                
-                
     # =====================================================
     # INSIGHTS TAB
     # =====================================================
@@ -213,7 +281,7 @@ class Dashboard:
             st.info("Insights require both competitors and heat_competitors datasets.")
             return
 
-        df_heat_results = prepare_heat_results(heat_competitors_df, competitors_df)
+        df_heat_results = self._prepared("heat_results", prepare_heat_results, "heat_competitors", "competitors")
 
         # -------- OVERVIEW METRICS --------
         st.markdown("### General Overview")
@@ -230,7 +298,10 @@ class Dashboard:
 
         # -------- AVERAGE & BEST TIMES --------
         st.subheader("Average and Best Race Time per Round")
-        df_heat_results["Result (s)"] = pd.to_numeric(df_heat_results["Result (s)"], errors="coerce")
+        # assign() rather than in-place: snapshot tables are shared across sessions
+        df_heat_results = df_heat_results.assign(
+            **{"Result (s)": pd.to_numeric(df_heat_results["Result (s)"], errors="coerce")}
+        )
         round_stats = (
             df_heat_results.groupby("Round Name", as_index=False)
             .agg(Average_Time=("Result (s)", "mean"),
@@ -285,6 +356,11 @@ class Dashboard:
             st.markdown("**Result Status / Penalties**")
             st.dataframe(status_counts, use_container_width=True)
 
+        st.divider()
+
+        # -------- CHARTS --------
+        self._show_event_charts()
+
     
         # ---------------- INSIGHTS ----------------
         st.subheader("Event Insights")
@@ -293,11 +369,13 @@ class Dashboard:
         competitors_df = self.datasets.get("competitors")
 
         if heat_competitors_df is not None and competitors_df is not None:
-            df_heat_results = prepare_heat_results(heat_competitors_df, competitors_df)
+            df_heat_results = self._prepared("heat_results", prepare_heat_results, "heat_competitors", "competitors")
 
             # Convert numeric results safely
-            df_heat_results["Result (s)"] = pd.to_numeric(df_heat_results["Result (s)"], errors="coerce")
-            df_heat_results["Rank"] = pd.to_numeric(df_heat_results["Rank"], errors="coerce")
+            df_heat_results = df_heat_results.assign(**{
+                "Result (s)": pd.to_numeric(df_heat_results["Result (s)"], errors="coerce"),
+                "Rank": pd.to_numeric(df_heat_results["Rank"], errors="coerce"),
+            })
 
             # =====================================================
             # Winner Summary
@@ -2,11 +2,35 @@
 # DATASET MANAGER
 # ====================================================
 
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 import pandas as pd
 import streamlit as st
 
 
+# Column added to every frame returned by load_events() so rows from
+# different event folders can be told apart after concatenation.
+EVENT_COLUMN = "event_folder"
+
+# pandas' C parser releases the GIL, so a handful of threads is enough to
+# keep the disk busy without oversubscribing the machine.
+DEFAULT_MAX_WORKERS = 8
+
+# File suffix of event snapshot bundles written by snapshot.py.
+SNAPSHOT_SUFFIX = ".isusnap"
+
+
+@dataclass
+class BulkLoadReport:
+    """Result of DatasetManager.load_events()."""
+
+    tables: dict = field(default_factory=dict)     # table name -> combined, event-tagged DataFrame
+    timings: list = field(default_factory=list)    # one {"event", "table", "rows", "seconds"} per file read
+    failures: list = field(default_factory=list)   # one {"event", "file", "error", "seconds"} per file or folder that failed
+
+
 class DatasetManager:
     """Responsible for discovering and loading all dataset folders."""
 
@@ -14,19 +38,138 @@ class DatasetManager:
         self.base_data_folder = base_data_folder
 
     def list_available_events(self):
-        """Return all subfolders under processed_datasets."""
-        return [f for f in self.base_data_folder.iterdir() if f.is_dir()]
+        """Return all event subfolders and snapshot bundles under processed_datasets.
+
+        When an event exists both as a folder and as a snapshot bundle, the
+        bundle is returned only if it is at least as new as the folder's CSVs;
+        otherwise the folder wins so updated data is never hidden.
+        """
+        folders = {}
+        bundles = {}
+        for f in self.base_data_folder.iterdir():
+            if f.is_dir():
+                folders[f.name] = f
+            elif f.name.endswith(SNAPSHOT_SUFFIX):
+                bundles[self.event_name(f)] = f
+
+        events = []
+        for name in sorted(set(folders) | set(bundles)):
+            folder = folders.get(name)
+            bundle = bundles.get(name)
+            if bundle is not None and (folder is None or self.data_version(bundle) >= self.data_version(folder)):
+                events.append(bundle)
+            else:
+                events.append(folder)
+        return events
+
+    @staticmethod
+    def event_name(path: Path) -> str:
+        """Event name for an event folder or snapshot bundle."""
+        return path.name.removesuffix(SNAPSHOT_SUFFIX)
+
+    @staticmethod
+    def data_version(path: Path) -> float:
+        """Latest modification time of an event folder's CSVs (or of a bundle file)."""
+        if path.is_dir():
+            return max((f.stat().st_mtime for f in path.glob("*.csv")), default=0.0)
+        return path.stat().st_mtime
+
+    @staticmethod
+    def is_snapshot(path: Path) -> bool:
+        return path.is_file() and path.name.endswith(SNAPSHOT_SUFFIX)
+
+    def load_snapshot(self, bundle_path: Path):
+        """Open a snapshot bundle written by snapshot.py (memory-mapped, no CSV parsing)."""
+        # Imported here: snapshot.py pulls in the chart layer for exporting.
+        from snapshot import read_snapshot
+        return read_snapshot(bundle_path)
 
     def load_datasets_from_folder(self, folder: Path):
         """Load all CSVs from a given folder into a dict."""
         dataset_map = {}
         for csv_file in folder.glob("*.csv"):
             try:
-                df = pd.read_csv(csv_file)
-                if "Unnamed: 0" in df.columns:
-                    df = df.drop(columns=["Unnamed: 0"])
-                dataset_map[csv_file.stem.lower()] = df
+                dataset_map[csv_file.stem.lower()] = self._read_csv(csv_file)
             except Exception as e:
                 st.warning(f"Could not load {csv_file.name}: {e}")
         return dataset_map
 
+    def load_events(self, folders=None, max_workers: int = DEFAULT_MAX_WORKERS) -> BulkLoadReport:
+        """Load many event folders at once, reading every CSV on a bounded thread pool.
+
+        Defaults to every event folder under the base folder; snapshot bundles
+        are not read here (use load_snapshot).
+
+        Returns one combined DataFrame per table, tagged with the event folder
+        name in EVENT_COLUMN. A file that fails to load, or a path that is not
+        an event folder, is recorded in the report's failures and does not
+        abort the rest of the batch.
+        """
+        if folders is None:
+            folders = [f for f in self.base_data_folder.iterdir() if f.is_dir()]
+        folders = sorted((Path(f) for f in folders), key=lambda f: f.name)
+
+        report = BulkLoadReport()
+        event_folders = []
+        for folder in folders:
+            if folder.is_dir():
+                event_folders.append(folder)
+            else:
+                report.failures.append({
+                    "event": folder.name,
+                    "file": None,
+                    "error": f"{folder} is not an event folder",
+                    "seconds": 0.0,
+                })
+
+        # Flatten to (folder, file) jobs so a single pool bounds the total
+        # number of concurrent reads, however the files are spread across folders.
+        jobs = [(folder, csv_file) for folder in event_folders for csv_file in sorted(folder.glob("*.csv"))]
+
+        if not jobs:
+            return report
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(self._timed_read, [csv_file for _, csv_file in jobs]))
+
+        frames_by_table = {}
+        for (folder, csv_file), (df, seconds, error) in zip(jobs, results):
+            if error is not None:
+                report.failures.append({
+                    "event": folder.name,
+                    "file": csv_file.name,
+                    "error": error,
+                    "seconds": seconds,
+                })
+                continue
+
+            table = csv_file.stem.lower()
+            report.timings.append({
+                "event": folder.name,
+                "table": table,
+                "rows": len(df),
+                "seconds": seconds,
+            })
+            frames_by_table.setdefault(table, []).append(df.assign(**{EVENT_COLUMN: folder.name}))
+
+        report.tables = {
+            table: pd.concat(frames, ignore_index=True)
+            for table, frames in frames_by_table.items()
+        }
+        return report
+
+    def _timed_read(self, csv_file: Path):
+        """Read one CSV, returning (DataFrame, seconds, error message or None)."""
+        start = time.perf_counter()
+        try:
+            df = self._read_csv(csv_file)
+            return df, time.perf_counter() - start, None
+        except Exception as e:
+            return None, time.perf_counter() - start, str(e)
+
+    @staticmethod
+    def _read_csv(csv_file: Path) -> pd.DataFrame:
+        df = pd.read_csv(csv_file)
+        if "Unnamed: 0" in df.columns:
+            df = df.drop(columns=["Unnamed: 0"])
+        return df
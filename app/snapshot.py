@@ -0,0 +1,225 @@
+# =====================================================
+# EVENT SNAPSHOTS
+# =====================================================
+# A snapshot bundles one fully prepared event into a single file so another
+# node can serve it without parsing, cleaning, joining or aggregating again.
+#
+# Layout: an uncompressed tar archive holding manifest.json plus one Arrow IPC
+# file per table under raw/, cleaned/ and aggregates/. Tar stores members
+# uncompressed and 512-byte aligned, so the whole bundle is memory-mapped and
+# each table is opened in place, only when it is first used. IPC files are
+# uncompressed by default so numeric columns stay zero-copy; --compression
+# lz4/zstd trades that for smaller bundles (buffers are decompressed on read).
+#
+# Usage:
+#     python app/snapshot.py processed_datasets [--output DIR] [--compression none|lz4|zstd]
+
+import argparse
+import io
+import json
+import sys
+import tarfile
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from charts import compute_event_aggregates
+from data_loader import (
+    clean_events_dataframe,
+    clean_rounds_dataframe,
+    clean_heats_dataframe,
+    prepare_heat_results,
+    prepare_lap_results,
+)
+from dataset_manager import DatasetManager, EVENT_COLUMN, SNAPSHOT_SUFFIX
+
+
+SNAPSHOT_FORMAT = "isu-event-snapshot"
+SNAPSHOT_VERSION = 2   # 2: country_performance counts "Athletes"
+DEFAULT_COMPRESSION = None
+SECTIONS = ("raw", "cleaned", "aggregates")
+
+
+# ===================== PREPARATION =====================
+def prepare_event_tables(datasets: dict) -> dict:
+    """Run every clean_* / prepare_* function that has the raw tables it needs."""
+    events_df = datasets.get("events")
+    rounds_df = datasets.get("rounds")
+    heats_df = datasets.get("heats")
+    heat_competitors_df = datasets.get("heat_competitors")
+    laps_df = datasets.get("laps")
+    competitors_df = datasets.get("competitors")
+
+    cleaned = {}
+    if events_df is not None:
+        cleaned["events"] = clean_events_dataframe(events_df)
+    if rounds_df is not None:
+        cleaned["rounds"] = clean_rounds_dataframe(rounds_df)
+    if heats_df is not None:
+        cleaned["heats"] = clean_heats_dataframe(heats_df)
+    if heat_competitors_df is not None and competitors_df is not None:
+        cleaned["heat_results"] = prepare_heat_results(heat_competitors_df, competitors_df)
+    if laps_df is not None and competitors_df is not None:
+        cleaned["lap_results"] = prepare_lap_results(laps_df, competitors_df)
+    return cleaned
+
+
+# ===================== EXPORT =====================
+def _to_ipc_bytes(df: pd.DataFrame, compression) -> bytes:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _add_member(archive: tarfile.TarFile, name: str, payload: bytes):
+    info = tarfile.TarInfo(name)
+    info.size = len(payload)
+    archive.addfile(info, io.BytesIO(payload))
+
+
+def write_snapshot(event_name: str, datasets: dict, output_dir: Path,
+                   compression=DEFAULT_COMPRESSION) -> Path:
+    """Write raw, cleaned and aggregated tables for one event into a bundle."""
+    sections = {
+        "raw": datasets,
+        "cleaned": prepare_event_tables(datasets),
+        "aggregates": compute_event_aggregates(datasets),
+    }
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "event": event_name,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "compression": compression,
+        "tables": {
+            section: {name: len(df) for name, df in tables.items()}
+            for section, tables in sections.items()
+        },
+    }
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    bundle_path = output_dir / f"{event_name}{SNAPSHOT_SUFFIX}"
+    tmp_path = bundle_path.with_suffix(bundle_path.suffix + ".tmp")
+
+    with tarfile.open(tmp_path, "w", format=tarfile.PAX_FORMAT) as archive:
+        _add_member(archive, "manifest.json", json.dumps(manifest, indent=2).encode("utf-8"))
+        for section, tables in sections.items():
+            for name, df in tables.items():
+                _add_member(archive, f"{section}/{name}.arrow", _to_ipc_bytes(df, compression))
+
+    # Replace atomically so a node never maps a half-written bundle.
+    tmp_path.replace(bundle_path)
+    return bundle_path
+
+
+# ===================== IMPORT =====================
+class SnapshotTables(Mapping):
+    """Read-only mapping of table name -> DataFrame, converted from the mapped bundle on first access."""
+
+    def __init__(self, readers: dict):
+        self._readers = readers     # table name -> pa.ipc.RecordBatchFileReader over the mapped bundle
+        self._frames = {}
+
+    def __getitem__(self, name):
+        if name not in self._frames:
+            self._frames[name] = self._readers[name].read_all().to_pandas(split_blocks=True)
+        return self._frames[name]
+
+    def __iter__(self):
+        return iter(self._readers)
+
+    def __len__(self):
+        return len(self._readers)
+
+
+def read_snapshot(bundle_path: Path) -> dict:
+    """Memory-map a bundle and return {"manifest", "raw", "cleaned", "aggregates"}.
+
+    Each section is a SnapshotTables mapping; tables are only converted to
+    DataFrames when accessed. Raises ValueError if the file is not a complete
+    snapshot of a supported version (e.g. truncated while being copied).
+    """
+    try:
+        with tarfile.open(bundle_path, "r:") as archive:
+            members = {m.name: (m.offset_data, m.size) for m in archive.getmembers() if m.isfile()}
+            manifest_member = archive.extractfile("manifest.json") if "manifest.json" in members else None
+            if manifest_member is None:
+                raise ValueError(f"{bundle_path.name} is not an event snapshot (no manifest).")
+            manifest = json.load(manifest_member)
+    except (tarfile.TarError, EOFError) as e:
+        raise ValueError(f"{bundle_path.name} is not a readable event snapshot: {e}") from e
+
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"{bundle_path.name} is not an event snapshot.")
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(
+            f"{bundle_path.name} has snapshot version {manifest.get('version')}, "
+            f"expected {SNAPSHOT_VERSION}. Re-export it."
+        )
+
+    # The buffer keeps the mapping alive for as long as any section uses it.
+    with pa.memory_map(str(bundle_path), "r") as source:
+        mapped = source.read_buffer()
+
+    snapshot = {"manifest": manifest}
+    try:
+        for section in SECTIONS:
+            readers = {}
+            for name in manifest["tables"].get(section, {}):
+                offset, size = members[f"{section}/{name}.arrow"]
+                if offset + size > mapped.size:
+                    raise ValueError(f"{bundle_path.name} is truncated ({section}/{name} is incomplete).")
+                # Opening a reader only parses the IPC footer; no table data is read yet.
+                readers[name] = pa.ipc.open_file(mapped.slice(offset, size))
+            snapshot[section] = SnapshotTables(readers)
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"{bundle_path.name} does not match its manifest: {e!r}") from e
+    return snapshot
+
+
+# ===================== CLI =====================
+def main():
+    parser = argparse.ArgumentParser(description="Export prepared event snapshots.")
+    parser.add_argument("data_folder", type=Path, help="Folder containing one subfolder per event.")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Where to write bundles (defaults to data_folder).")
+    parser.add_argument("--compression", default="none", choices=["none", "lz4", "zstd"])
+    args = parser.parse_args()
+
+    compression = None if args.compression == "none" else args.compression
+    output_dir = args.output or args.data_folder
+
+    manager = DatasetManager(args.data_folder)
+    failed_events = []
+    for folder in sorted(f for f in args.data_folder.iterdir() if f.is_dir()):
+        # One folder at a time keeps each event's dtypes exactly as a direct
+        # read would; the files inside the folder are still read in parallel.
+        report = manager.load_events([folder])
+        if report.failures:
+            # Never replace a good bundle with one that is missing tables.
+            for failure in report.failures:
+                print(f"Could not load {failure['event']}/{failure['file']}: {failure['error']}")
+            print(f"Skipped {folder.name}: not exported.")
+            failed_events.append(folder.name)
+            continue
+
+        datasets = {
+            table: df.drop(columns=[EVENT_COLUMN])
+            for table, df in report.tables.items()
+        }
+        bundle_path = write_snapshot(folder.name, datasets, output_dir, compression=compression)
+        print(f"Wrote {bundle_path} ({bundle_path.stat().st_size / 1024:.1f} KiB)")
+
+    if failed_events:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
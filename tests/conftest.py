@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The app modules import each other by bare name (streamlit runs app/main.py).
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
@@ -0,0 +1,131 @@
+import os
+
+from ai_explainer import AnswerCache, ask_qwen_cached, cache_key, pregenerate_answers
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalized_question_hits_cache():
+    calls = []
+
+    def ask(prompt):
+        calls.append(prompt)
+        return "Canada won."
+
+    cache = AnswerCache()
+    first = ask_qwen_cached("Who won?", "seoul_man", "ctx", cache, ask=ask)
+    second = ask_qwen_cached("  Can you please... WHO  won!", "seoul_man", "ctx", cache, ask=ask)
+
+    assert first == second == "Canada won."
+    assert len(calls) == 1
+
+
+def test_cache_key_depends_on_event_and_context():
+    assert cache_key("seoul_man", "who won", "a") != cache_key("seoul_woman", "who won", "a")
+    assert cache_key("seoul_man", "who won", "a") != cache_key("seoul_man", "who won", "b")
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = AnswerCache(ttl_seconds=10, clock=clock)
+    cache.put("key", "answer")
+
+    clock.now = 10
+    assert cache.get("key") == "answer"
+
+    clock.now = 10.5
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = AnswerCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+def test_failed_backend_calls_are_reported_and_not_cached():
+    def ask(prompt):
+        raise RuntimeError("Backend returned no response.")
+
+    cache = AnswerCache()
+    results = pregenerate_answers({"seoul_man": "ctx"}, cache, ask=ask, calls_per_second=0)
+
+    assert [r["status"] for r in results] == ["failed", "failed"]
+    assert all("no response" in r["error"] for r in results)
+    assert len(cache) == 0
+
+
+def test_pregenerate_skips_cached_answers():
+    calls = []
+
+    def ask(prompt):
+        calls.append(prompt)
+        return "summary"
+
+    cache = AnswerCache()
+    events = {"seoul_man": "ctx a", "seoul_woman": "ctx b"}
+    first = pregenerate_answers(events, cache, ask=ask, calls_per_second=0)
+    second = pregenerate_answers(events, cache, ask=ask, calls_per_second=0)
+
+    assert [r["status"] for r in first] == ["generated"] * 4
+    assert [r["status"] for r in second] == ["cached"] * 4
+    assert len(calls) == 4
+
+
+def test_malformed_cache_file_starts_empty(tmp_path):
+    path = tmp_path / "answer_cache.json"
+    path.write_text("{not json", encoding="utf-8")
+
+    assert len(AnswerCache().load(path)) == 0
+
+
+def test_refresh_picks_up_new_batch_answers(tmp_path):
+    path = tmp_path / "answer_cache.json"
+    cache = AnswerCache().refresh(path)
+    assert len(cache) == 0
+
+    batch = AnswerCache()
+    batch.put("key", "answer")
+    batch.save(path)
+
+    assert cache.refresh(path).get("key") == "answer"
+
+
+def test_malformed_file_is_retried_once_fixed(tmp_path):
+    path = tmp_path / "answer_cache.json"
+    path.write_text("[[\"key\", 0", encoding="utf-8")
+    mtime = path.stat().st_mtime
+
+    cache = AnswerCache().refresh(path)
+    assert len(cache) == 0
+
+    batch = AnswerCache()
+    batch.put("key", "answer")
+    batch.save(path)
+    # Coarse filesystem timestamps: the fixed file may carry the same mtime.
+    os.utime(path, (mtime, mtime))
+
+    assert cache.refresh(path).get("key") == "answer"
+
+
+def test_save_replaces_file_atomically(tmp_path):
+    path = tmp_path / "answer_cache.json"
+    cache = AnswerCache()
+    cache.put("key", "answer")
+    cache.save(path)
+
+    assert [p.name for p in tmp_path.iterdir()] == ["answer_cache.json"]
+    assert len(AnswerCache().load(path)) == 1
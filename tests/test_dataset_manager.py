@@ -0,0 +1,54 @@
+from dataset_manager import EVENT_COLUMN, DatasetManager
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def _event_tree(tmp_path):
+    _write(tmp_path / "seoul_man" / "heats.csv", "heat_name,num_competitors\nHeat 1,6\nHeat 2,5\n")
+    _write(tmp_path / "seoul_man" / "laps.csv", "Unnamed: 0,lap_number,lap_time\n0,1,6.79\n")
+    _write(tmp_path / "seoul_woman" / "heats.csv", "heat_name,num_competitors\nFinal A,7\n")
+    _write(tmp_path / "seoul_woman" / "laps.csv", "")   # empty CSV: fails to parse
+    return DatasetManager(tmp_path)
+
+
+def test_load_events_concatenates_tables_tagged_by_event(tmp_path):
+    report = _event_tree(tmp_path).load_events()
+
+    assert sorted(report.tables) == ["heats", "laps"]
+
+    heats = report.tables["heats"]
+    assert list(heats.columns) == ["heat_name", "num_competitors", EVENT_COLUMN]
+    assert heats["heat_name"].tolist() == ["Heat 1", "Heat 2", "Final A"]
+    assert heats[EVENT_COLUMN].tolist() == ["seoul_man", "seoul_man", "seoul_woman"]
+
+    # The index column is dropped, and the failed file does not stop the other rows.
+    laps = report.tables["laps"]
+    assert list(laps.columns) == ["lap_number", "lap_time", EVENT_COLUMN]
+    assert laps[EVENT_COLUMN].tolist() == ["seoul_man"]
+
+
+def test_load_events_reports_timings_and_failures_for_every_file(tmp_path):
+    manager = _event_tree(tmp_path)
+    report = manager.load_events([str(tmp_path / "seoul_man"), tmp_path / "seoul_woman", tmp_path / "missing"])
+
+    timed = [(t["event"], t["table"], t["rows"]) for t in report.timings]
+    assert timed == [("seoul_man", "heats", 2), ("seoul_man", "laps", 1), ("seoul_woman", "heats", 1)]
+    assert all(t["seconds"] >= 0 for t in report.timings)
+
+    failures = {(f["event"], f["file"]): f for f in report.failures}
+    assert set(failures) == {("missing", None), ("seoul_woman", "laps.csv")}
+    assert "not an event folder" in failures[("missing", None)]["error"]
+    assert failures[("seoul_woman", "laps.csv")]["seconds"] >= 0
+
+    assert sorted(report.tables) == ["heats", "laps"]
+
+
+def test_load_events_with_no_folders_returns_empty_report(tmp_path):
+    report = DatasetManager(tmp_path).load_events()
+
+    assert report.tables == {}
+    assert report.timings == []
+    assert report.failures == []
@@ -0,0 +1,113 @@
+import io
+import json
+import os
+import tarfile
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import snapshot
+from charts import compute_event_aggregates
+from dataset_manager import DatasetManager
+from snapshot import prepare_event_tables, read_snapshot, write_snapshot
+
+SAMPLE_EVENT = Path(__file__).resolve().parent.parent / "processed_datasets" / "seoul_woman"
+
+
+@pytest.fixture
+def event_folder(tmp_path):
+    """A small event: the first rows of every seoul_woman CSV."""
+    folder = tmp_path / "data" / "seoul_woman"
+    folder.mkdir(parents=True)
+    for csv_file in SAMPLE_EVENT.glob("*.csv"):
+        lines = csv_file.read_text(encoding="utf-8").splitlines(keepends=True)
+        (folder / csv_file.name).write_text("".join(lines[:40]), encoding="utf-8")
+    return folder
+
+
+def _export(event_folder, output_dir):
+    datasets = DatasetManager(event_folder.parent).load_datasets_from_folder(event_folder)
+    return datasets, write_snapshot(event_folder.name, datasets, output_dir)
+
+
+def _assert_tables_equal(expected: dict, actual):
+    assert sorted(actual) == sorted(expected)
+    for name, df in expected.items():
+        pd.testing.assert_frame_equal(actual[name], df, check_dtype=False)
+
+
+def test_snapshot_round_trip(event_folder, tmp_path):
+    datasets, bundle_path = _export(event_folder, tmp_path / "out")
+
+    assert bundle_path.name == "seoul_woman.isusnap"
+    with tarfile.open(bundle_path) as archive:
+        names = archive.getnames()
+    assert names[0] == "manifest.json"
+    assert "raw/laps.arrow" in names and "cleaned/lap_results.arrow" in names
+    assert "aggregates/lap_histogram.arrow" in names
+
+    bundle = read_snapshot(bundle_path)
+    assert bundle["manifest"]["event"] == "seoul_woman"
+    assert bundle["manifest"]["version"] == snapshot.SNAPSHOT_VERSION
+
+    # Tables are only converted when first accessed.
+    assert bundle["raw"]._frames == {}
+
+    _assert_tables_equal(datasets, bundle["raw"])
+    _assert_tables_equal(prepare_event_tables(datasets), bundle["cleaned"])
+    _assert_tables_equal(compute_event_aggregates(datasets), bundle["aggregates"])
+
+
+def test_wrong_version_raises_value_error(event_folder, tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "SNAPSHOT_VERSION", 999)
+    _, bundle_path = _export(event_folder, tmp_path / "out")
+    monkeypatch.undo()
+
+    with pytest.raises(ValueError, match="version 999"):
+        read_snapshot(bundle_path)
+
+
+@pytest.mark.parametrize("corrupt", ["truncated", "short", "garbage", "empty"])
+def test_corrupt_bundle_raises_value_error(event_folder, tmp_path, corrupt):
+    _, bundle_path = _export(event_folder, tmp_path / "out")
+    payload = bundle_path.read_bytes()
+    bundle_path.write_bytes({
+        "truncated": payload[: len(payload) // 2],
+        "short": payload[:300],
+        "garbage": os.urandom(4096),
+        "empty": b"",
+    }[corrupt])
+
+    with pytest.raises(ValueError):
+        read_snapshot(bundle_path)
+
+
+def test_manifest_table_without_member_raises_value_error(event_folder, tmp_path):
+    _, bundle_path = _export(event_folder, tmp_path / "out")
+    with tarfile.open(bundle_path) as archive:
+        manifest = json.load(archive.extractfile("manifest.json"))
+    manifest["tables"]["raw"]["missing"] = 1
+
+    broken = tmp_path / "broken.isusnap"
+    with tarfile.open(broken, "w") as archive:
+        payload = json.dumps(manifest).encode("utf-8")
+        info = tarfile.TarInfo("manifest.json")
+        info.size = len(payload)
+        archive.addfile(info, io.BytesIO(payload))
+
+    with pytest.raises(ValueError, match="does not match its manifest"):
+        read_snapshot(broken)
+
+
+def test_bundle_only_wins_while_newer_than_csvs(event_folder):
+    data_folder = event_folder.parent
+    _, bundle_path = _export(event_folder, data_folder)
+    manager = DatasetManager(data_folder)
+
+    csv_mtime = manager.data_version(event_folder)
+    os.utime(bundle_path, (csv_mtime + 10, csv_mtime + 10))
+    assert manager.list_available_events() == [bundle_path]
+
+    os.utime(bundle_path, (csv_mtime - 10, csv_mtime - 10))
+    assert manager.list_available_events() == [event_folder]